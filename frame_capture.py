@@ -0,0 +1,244 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import pygame
+
+# Non-blocking frame recorder for the pygame games.
+# The game loop only blits the screen into one of a few reusable surfaces;
+# converting and writing the frames happens on a background thread.
+
+# Supported output modes
+PNG = "png"  # One PNG file per frame
+RAW = "raw"  # All frames appended to one raw RGB file
+
+# Writer threads of every recorder, so they can be waited for at exit
+_writer_threads = []
+
+
+def _to_rgb_bytes(surface):
+    # pygame 2.1.3 renamed tostring to tobytes
+    if hasattr(pygame.image, "tobytes"):
+        return pygame.image.tobytes(surface, "RGB")
+    return pygame.image.tostring(surface, "RGB")
+
+
+def _png_chunk(kind, data):
+    chunk = kind + data
+    return struct.pack(">I", len(data)) + chunk + struct.pack(">I", zlib.crc32(chunk) & 0xFFFFFFFF)
+
+
+def encode_png(rgb, width, height, level=1):
+    """Encode raw RGB bytes as a PNG image.
+
+    zlib releases the GIL while compressing, so this does not hold up the
+    game loop when it runs on the writer thread.
+    """
+    stride = width * 3
+    # Every scanline starts with filter type 0 (none)
+    scanlines = b"".join(b"\x00" + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"IDAT", zlib.compress(scanlines, level))
+            + _png_chunk(b"IEND", b""))
+
+
+class FrameRecorder:
+    """Record frames from a pygame surface without stalling the game loop.
+
+    Frames are copied into a ring of `ring_size` reusable surfaces and handed
+    to a writer thread. When the writer falls behind and the ring is full,
+    new frames are dropped (and counted) or, with `drop_frames=False`, the
+    game waits for a free slot.
+
+    Every recording gets its own directory: if `output_dir` already exists
+    a number is added to the name. Next to the frames, recording.json holds
+    the size, frame rate and frame count needed to decode them, e.g.
+    ffmpeg -f rawvideo -pixel_format rgb24 -video_size WxH -framerate FPS -i frames.rgb
+    """
+
+    def __init__(self, output_dir, mode=PNG, ring_size=8, drop_frames=True, fps=60):
+        if mode not in (PNG, RAW):
+            raise ValueError(f"Unknown capture mode: {mode}")
+
+        self.output_dir = output_dir
+        self.mode = mode
+        self.drop_frames = drop_frames
+        self.fps = fps
+        self.size = None
+
+        # Ring of reusable surfaces, created from the first captured frame
+        self.slots = [None] * ring_size
+        self.free_slots = queue.Queue()
+        for index in range(ring_size):
+            self.free_slots.put(index)
+        self.pending = queue.Queue()
+
+        # Counters
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+        self.error = None  # Why the writer stopped, if it failed
+
+        self.raw_file = None
+        self.thread = None
+
+    def start(self):
+        try:
+            self._make_output_dir()
+            if self.mode == RAW:
+                self.raw_file = open(os.path.join(self.output_dir, "frames.rgb"), "wb")
+        except OSError as exc:
+            # Nothing gets recorded, but the game keeps running
+            self.error = f"{type(exc).__name__}: {exc}"
+            return
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        _writer_threads.append(self.thread)
+
+    def _make_output_dir(self):
+        # Never write into another recording's directory
+        base = self.output_dir
+        number = 1
+        while True:
+            try:
+                os.makedirs(self.output_dir)
+                return
+            except FileExistsError:
+                number += 1
+                self.output_dir = f"{base}_{number}"
+
+    def _write_info(self):
+        width, height = self.size
+        info = {
+            "mode": self.mode,
+            "width": width,
+            "height": height,
+            "fps": self.fps,
+            "pixel_format": "rgb24",
+            "frames": self.written,
+        }
+        with open(os.path.join(self.output_dir, "recording.json"), "w") as info_file:
+            json.dump(info, info_file, indent=4)
+
+    def capture(self, surface):
+        """Queue a copy of `surface`. Returns False if the frame was dropped."""
+        if self.thread is None:
+            return False
+
+        if self.size is None:
+            self.size = surface.get_size()
+        elif surface.get_size() != self.size:
+            raise ValueError("All captured frames must have the same size")
+
+        try:
+            index = self._free_slot()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+
+        # Reuse the slot surface instead of allocating a new one every frame
+        if self.slots[index] is None:
+            self.slots[index] = surface.copy()
+        else:
+            self.slots[index].blit(surface, (0, 0))
+
+        self.pending.put((index, self.captured))
+        self.captured += 1
+        return True
+
+    def _free_slot(self):
+        if self.drop_frames:
+            return self.free_slots.get_nowait()
+        # Wait for the writer, but not for one that has stopped
+        while True:
+            if not self.thread.is_alive():
+                return self.free_slots.get_nowait()
+            try:
+                return self.free_slots.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    def _writer(self):
+        try:
+            self._write_frames()
+        except (OSError, pygame.error) as exc:
+            # Keep the game running; new frames are dropped from now on
+            self.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            if self.raw_file is not None:
+                try:
+                    self.raw_file.close()
+                except OSError:
+                    pass
+                self.raw_file = None
+
+    def _write_frames(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                if self.size is not None:
+                    self._write_info()
+                break
+
+            index, frame_number = item
+            rgb = _to_rgb_bytes(self.slots[index])
+            # The slot can be reused as soon as its pixels are copied out
+            self.free_slots.put(index)
+
+            if self.mode == PNG:
+                width, height = self.size
+                path = os.path.join(self.output_dir, f"frame_{frame_number:06d}.png")
+                with open(path, "wb") as png_file:
+                    png_file.write(encode_png(rgb, width, height))
+            else:
+                self.raw_file.write(rgb)
+            self.written += 1
+
+            if self.written == 1:
+                # Written now too, in case the recording is never stopped
+                self._write_info()
+
+    def queue_depth(self):
+        return self.pending.qsize()
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": self.queue_depth(),
+            "error": self.error,
+        }
+
+    def stop(self, wait=False):
+        """Stop recording. The writer thread finishes the queued frames on
+        its own; pass wait=True to block until it is done."""
+        if self.thread is None:
+            return
+        self.pending.put(None)
+        if wait:
+            self.thread.join()
+        self.thread = None
+
+
+def new_recording(game_name, mode=PNG, fps=60):
+    """Start a recorder writing to captures/<game_name>_<timestamp>."""
+    output_dir = os.path.join("captures", f"{game_name}_{time.strftime('%Y%m%d_%H%M%S')}")
+    recorder = FrameRecorder(output_dir, mode, fps=fps)
+    recorder.start()
+    return recorder
+
+
+def wait_for_recordings():
+    """Block until every stopped recorder has written its frames.
+
+    Call this once when the game exits, never from the game loop.
+    """
+    while _writer_threads:
+        _writer_threads.pop().join()
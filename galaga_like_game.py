@@ -1,8 +1,11 @@
 import pygame
 import random
-import math
 import sys
 
+from frame_capture import new_recording, wait_for_recordings
+from galaga_waves import SWAY_TABLE, load_waves
+from telemetry import Telemetry
+
 # Initialize Pygame
 pygame.init()
 
@@ -20,6 +23,12 @@ BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 CYAN = (0, 255, 255)
 
+# Flight paths and waves, precomputed once and shared by all enemies
+WAVE_BOOK = load_waves()
+
+# Scores and events are written in the background
+TELEMETRY = Telemetry()
+
 class Player:
     def __init__(self, x, y):
         self.x = x
@@ -67,7 +76,7 @@ class Player:
             bullet.draw(screen)
 
 class Enemy:
-    def __init__(self, x, y, enemy_type=0):
+    def __init__(self, x, y, enemy_type=0, dive_chance=500):
         self.x = x
         self.y = y
         self.original_x = x
@@ -78,10 +87,14 @@ class Enemy:
         self.bullets = []
         self.enemy_type = enemy_type  # 0: basic, 1: fast, 2: shooter
         self.shoot_timer = 0
-        self.formation_angle = 0
-        self.in_formation = True
-        self.dive_target = None
-        self.dive_speed = 3
+        self.formation_frame = 0
+        self.dive_chance = dive_chance
+        
+        # Current flight path (offsets from the formation slot)
+        self.path = None
+        self.path_index = 0
+        self.path_delay = 0
+        self.mirror = 1
         
         # Set properties based on type
         if enemy_type == 0:  # Basic enemy
@@ -95,33 +108,42 @@ class Enemy:
             self.color = WHITE
             self.points = 300
             
+    def start_path(self, path, delay=0, mirror=1):
+        self.path = path
+        self.path_index = 0
+        self.path_delay = delay
+        self.mirror = mirror
+        
     def update(self, player):
-        self.formation_angle += 0.02
+        self.formation_frame = (self.formation_frame + 1) % len(SWAY_TABLE)
+        sway_x, sway_y = SWAY_TABLE[self.formation_frame]
+        offset_x, offset_y = 0, 0
         
-        if self.in_formation:
-            # Formation flying pattern
-            self.x = self.original_x + math.sin(self.formation_angle) * 20
-            self.y = self.original_y + math.sin(self.formation_angle * 0.5) * 10
-            
-            # Occasionally dive at player
-            if random.randint(1, 500) == 1:
-                self.in_formation = False
-                self.dive_target = (player.x, player.y)
-        else:
-            # Diving behavior
-            if self.dive_target:
-                dx = self.dive_target[0] - self.x
-                dy = self.dive_target[1] - self.y
-                distance = math.sqrt(dx*dx + dy*dy)
+        if self.path:
+            # Follow the precomputed path, waiting first if delayed
+            if self.path_delay > 0:
+                self.path_delay -= 1
+            else:
+                self.path_index += 1
                 
-                if distance > 5:
-                    self.x += (dx / distance) * self.dive_speed
-                    self.y += (dy / distance) * self.dive_speed
+            if self.path_index >= len(self.path):
+                # Continue with the next path or settle into formation
+                next_path = WAVE_BOOK.next_path(self.path)
+                if next_path:
+                    self.start_path(next_path, mirror=self.mirror)
                 else:
-                    # Return to formation or continue off screen
-                    self.y += self.dive_speed
-                    if self.y > HEIGHT + 50:
-                        self.reset_position()
+                    self.reset_position()
+                    
+            if self.path:
+                offset_x, offset_y = self.path.points[self.path_index]
+                offset_x *= self.mirror
+        elif random.randint(1, self.dive_chance) == 1:
+            # Occasionally dive, curving towards the player's side
+            mirror = 1 if player.x >= self.x else -1
+            self.start_path(random.choice(WAVE_BOOK.dives), mirror=mirror)
+            
+        self.x = self.original_x + sway_x + offset_x
+        self.y = self.original_y + sway_y + offset_y
                         
         # Shooting for shooter type enemies
         if self.enemy_type == 2:
@@ -143,7 +165,7 @@ class Enemy:
     def reset_position(self):
         self.x = self.original_x
         self.y = self.original_y
-        self.in_formation = True
+        self.path = None
         
     def draw(self, screen):
         # Draw enemy based on type
@@ -198,26 +220,29 @@ class Game:
         self.game_over = False
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.recorder = None
+        self.session = TELEMETRY.start_session("galaga")
+        self.high_score = 0
         self.spawn_enemies()
         
     def spawn_enemies(self):
         self.enemies = []
-        rows = 4 + self.level
-        cols = 8
+        wave = WAVE_BOOK.wave(self.level)
         
-        for row in range(rows):
-            for col in range(cols):
+        for group in wave["groups"]:
+            path = WAVE_BOOK.paths[group["path"]]
+            mirror = -1 if group.get("mirror") else 1
+            
+            for i, (col, row) in enumerate(group["slots"]):
                 x = col * 60 + 100
                 y = row * 50 + 50
-                enemy_type = 0
+                enemy = Enemy(x, y, group["type"], wave.get("dive_chance", 500))
                 
-                # Mix enemy types
-                if row == 0:
-                    enemy_type = 2  # Top row shooters
-                elif row == 1:
-                    enemy_type = 1  # Second row fast enemies
-                    
-                enemy = Enemy(x, y, enemy_type)
+                # Fly in along the group's path, one after another
+                enemy.start_path(path, group.get("delay", 0) + i * group.get("spacing", 0), mirror)
+                offset_x, offset_y = path.points[0]
+                enemy.x = x + offset_x * mirror
+                enemy.y = y + offset_y
                 self.enemies.append(enemy)
                 
     def handle_collisions(self):
@@ -239,19 +264,28 @@ class Game:
                 bullet_rect = bullet.get_rect()
                 if bullet_rect.colliderect(player_rect):
                     enemy.bullets.remove(bullet)
-                    self.player.lives -= 1
-                    if self.player.lives <= 0:
-                        self.game_over = True
+                    self.lose_life()
                     break
                     
         # Enemies vs player (collision)
         for enemy in self.enemies:
             enemy_rect = pygame.Rect(enemy.x, enemy.y, enemy.width, enemy.height)
             if enemy_rect.colliderect(player_rect):
-                self.player.lives -= 1
                 enemy.reset_position()
-                if self.player.lives <= 0:
-                    self.game_over = True
+                self.lose_life()
+                    
+    def lose_life(self):
+        if self.game_over:
+            return
+        self.player.lives -= 1
+        TELEMETRY.event(self.session, "death", lives=self.player.lives, score=self.player.score)
+        if self.player.lives <= 0:
+            self.game_over = True
+            self.end_session()
+            
+    def end_session(self):
+        TELEMETRY.end_session(self.session, score=self.player.score, level=self.level)
+        self.high_score = TELEMETRY.high_score("galaga")
                     
     def update(self):
         if not self.game_over:
@@ -267,6 +301,7 @@ class Game:
             # Check if all enemies are destroyed
             if not self.enemies:
                 self.level += 1
+                TELEMETRY.event(self.session, "level", level=self.level, score=self.player.score)
                 self.spawn_enemies()
                 
     def draw(self):
@@ -290,7 +325,8 @@ class Game:
             # Instructions
             instructions = [
                 "Arrow Keys: Move",
-                "Space: Shoot"
+                "Space: Shoot",
+                "F12: Record"
             ]
             for i, instruction in enumerate(instructions):
                 text = self.small_font.render(instruction, True, WHITE)
@@ -299,11 +335,17 @@ class Game:
             # Game Over screen
             game_over_text = self.font.render("GAME OVER", True, RED)
             score_text = self.font.render(f"Final Score: {self.player.score}", True, WHITE)
+            high_score_text = self.small_font.render(f"High Score: {self.high_score}", True, WHITE)
             restart_text = self.small_font.render("Press R to Restart or Q to Quit", True, WHITE)
             
             self.screen.blit(game_over_text, (WIDTH // 2 - 100, HEIGHT // 2 - 60))
             self.screen.blit(score_text, (WIDTH // 2 - 120, HEIGHT // 2 - 20))
-            self.screen.blit(restart_text, (WIDTH // 2 - 120, HEIGHT // 2 + 20))
+            self.screen.blit(high_score_text, (WIDTH // 2 - 120, HEIGHT // 2 + 20))
+            self.screen.blit(restart_text, (WIDTH // 2 - 120, HEIGHT // 2 + 50))
+            
+        # Hand the finished frame to the recorder (copied, not saved here)
+        if self.recorder:
+            self.recorder.capture(self.screen)
             
         pygame.display.flip()
         
@@ -314,14 +356,26 @@ class Game:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and not self.game_over:
                     self.player.shoot()
+                elif event.key == pygame.K_F12:
+                    self.toggle_recording()
                 elif event.key == pygame.K_r and self.game_over:
-                    # Restart game
+                    # Restart game (keep recording if it is running)
+                    recorder = self.recorder
                     self.__init__()
+                    self.recorder = recorder
                 elif event.key == pygame.K_q and self.game_over:
                     return False
         return True
         
+    def toggle_recording(self):
+        if self.recorder:
+            self.recorder.stop()
+            self.recorder = None
+        else:
+            self.recorder = new_recording("galaga", fps=FPS)
+            
     def run(self):
+        TELEMETRY.start()
         running = True
         while running:
             running = self.handle_events()
@@ -329,6 +383,11 @@ class Game:
             self.draw()
             self.clock.tick(FPS)
             
+        if self.recorder:
+            self.recorder.stop()
+        wait_for_recordings()
+        TELEMETRY.end_session(self.session, score=self.player.score, level=self.level)
+        TELEMETRY.stop()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,148 @@
+import json
+import math
+import os
+
+# Wave and trajectory engine for galaga_like_game.
+# Flight paths are Catmull-Rom splines that are turned into fixed-step
+# lookup tables once at load time; enemies then move by reading the next
+# table entry, so there is no per-frame trig.
+
+WAVES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "galaga_waves.json")
+
+SPLINE_STEPS = 32  # Samples per spline segment before resampling
+
+# Difficulty once the waves start repeating
+EXTRA_COLUMNS = 2  # Columns added to the formation on repeated waves
+DIVE_CHANCE_STEP = 30  # Dives get this much more likely every level
+MIN_DIVE_CHANCE = 60
+
+# Formation sway, matching the old sin(angle) * 20 / sin(angle * 0.5) * 10
+# pattern with the angle growing by 0.02 per frame
+SWAY_STEP = 0.02
+SWAY_FRAMES = round(4 * math.pi / SWAY_STEP)
+SWAY_TABLE = [(math.sin(i * SWAY_STEP) * 20, math.sin(i * SWAY_STEP * 0.5) * 10)
+              for i in range(SWAY_FRAMES)]
+
+
+def catmull_rom(points, steps=SPLINE_STEPS):
+    """Sample a Catmull-Rom spline passing through all `points`."""
+    if len(points) < 2:
+        return [tuple(point) for point in points]
+
+    # Repeat the end points so the curve starts and ends on them
+    padded = [points[0]] + list(points) + [points[-1]]
+    samples = []
+    for i in range(1, len(padded) - 2):
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = padded[i - 1:i + 3]
+        for step in range(steps):
+            t = step / steps
+            t2 = t * t
+            t3 = t2 * t
+            x = 0.5 * (2 * x1 + (x2 - x0) * t + (2 * x0 - 5 * x1 + 4 * x2 - x3) * t2
+                       + (3 * x1 - x0 - 3 * x2 + x3) * t3)
+            y = 0.5 * (2 * y1 + (y2 - y0) * t + (2 * y0 - 5 * y1 + 4 * y2 - y3) * t2
+                       + (3 * y1 - y0 - 3 * y2 + y3) * t3)
+            samples.append((x, y))
+    samples.append(tuple(points[-1]))
+    return samples
+
+
+def resample(samples, speed):
+    """Walk along `samples` at `speed` pixels per frame and return one
+    point per frame, so enemies move at a constant speed."""
+    table = [samples[0]]
+    carried = 0.0  # Distance already covered towards the next frame
+    for (x1, y1), (x2, y2) in zip(samples, samples[1:]):
+        length = math.hypot(x2 - x1, y2 - y1)
+        if length == 0:
+            continue
+        distance = speed - carried
+        while distance <= length:
+            t = distance / length
+            table.append((x1 + (x2 - x1) * t, y1 + (y2 - y1) * t))
+            distance += speed
+        carried = length - (distance - speed)
+    if table[-1] != samples[-1]:
+        table.append(samples[-1])
+    return table
+
+
+class Path:
+    """A precomputed flight path shared by every enemy that flies it.
+
+    Points are offsets from the enemy's anchor (its formation slot), one
+    per frame. `next_name` names the path to follow once this one ends.
+    """
+
+    def __init__(self, name, points, speed, next_name=None):
+        self.name = name
+        self.points = resample(catmull_rom(points), speed)
+        self.next_name = next_name
+
+    def __len__(self):
+        return len(self.points)
+
+
+class WaveBook:
+    """All paths and waves loaded from a wave file."""
+
+    def __init__(self, data):
+        self.paths = {}
+        for name, spec in data["paths"].items():
+            self.paths[name] = Path(name, spec["points"], spec.get("speed", 4), spec.get("next"))
+        for path in self.paths.values():
+            if path.next_name is not None and path.next_name not in self.paths:
+                raise ValueError(f"Path {path.name} continues with unknown path {path.next_name}")
+
+        self.dives = [self.paths[name] for name in data["dives"]]
+        self.waves = data["waves"]
+        for wave in self.waves:
+            for group in wave["groups"]:
+                if group["path"] not in self.paths:
+                    raise ValueError(f"Wave uses unknown path {group['path']}")
+
+        # Size of the full formation flown by repeated waves
+        slots = [slot for wave in self.waves for group in wave["groups"] for slot in group["slots"]]
+        self.columns = max(col for col, row in slots) + 1 + EXTRA_COLUMNS
+        self.rows = max(row for col, row in slots) + 1
+        self.lowest_dive_chance = min(wave.get("dive_chance", 500) for wave in self.waves)
+
+    def wave(self, level):
+        """Return the wave for `level`.
+
+        Waves repeat once they run out. A repeated wave fills the whole
+        formation and dives more often every level, so it is never easier
+        than the level before it.
+        """
+        index = level - 1
+        wave = self.waves[index % len(self.waves)]
+        if index < len(self.waves):
+            return wave
+
+        groups = [dict(group, slots=list(group["slots"])) for group in wave["groups"]]
+        taken = {tuple(slot) for group in groups for slot in group["slots"]}
+        group_for_row = {row: group for group in groups for col, row in group["slots"]}
+        for row in range(self.rows):
+            if row not in group_for_row:
+                # Rows the wave does not use fly in after its last group
+                last = groups[-1]
+                delay = last.get("delay", 0) + len(last["slots"]) * last.get("spacing", 0)
+                group_for_row[row] = dict(last, slots=[], delay=delay)
+                groups.append(group_for_row[row])
+            for col in range(self.columns):
+                if (col, row) not in taken:
+                    group_for_row[row]["slots"].append([col, row])
+
+        levels_repeated = index + 1 - len(self.waves)
+        dive_chance = max(MIN_DIVE_CHANCE, self.lowest_dive_chance - DIVE_CHANCE_STEP * levels_repeated)
+        return dict(wave, groups=groups, dive_chance=dive_chance)
+
+    def next_path(self, path):
+        if path.next_name is None:
+            return None
+        return self.paths[path.next_name]
+
+
+def load_waves(filename=WAVES_FILE):
+    with open(filename) as wave_file:
+        return WaveBook(json.load(wave_file))
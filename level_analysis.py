@@ -0,0 +1,256 @@
+import bisect
+from collections import deque
+
+# Level analysis for the side scroller.
+# Platforms are plain (x, y, width, height) tuples so this module works
+# without pygame and can check thousands of generated layouts per second.
+
+
+class JumpEnvelope:
+    """Precomputed jump arc of the player.
+
+    Mirrors the frame-by-frame physics in side_scroller.Player: every frame
+    the player moves up to `speed` pixels sideways, gravity is added to the
+    vertical velocity and the velocity is added to y. Only frames where the
+    player is falling (velocity >= 0) can land on a platform.
+    """
+
+    def __init__(self, gravity, jump_velocity, speed, player_width, player_height, max_drop=2000):
+        self.speed = speed
+        self.player_width = player_width
+        self.player_height = player_height
+
+        # Frame numbers and feet offsets (positive = lower than take-off)
+        # for every falling frame, in order. Offsets never decrease so they
+        # can be searched with bisect.
+        self.frames = []
+        self.drops = []
+        velocity = jump_velocity
+        offset = 0
+        frame = 0
+        while offset <= max_drop:
+            frame += 1
+            velocity += gravity
+            offset += velocity
+            if velocity >= 0:
+                self.frames.append(frame)
+                self.drops.append(offset)
+
+    def reach(self, dy, target_height):
+        """Return how far sideways the player can travel before landing on a
+        platform `dy` pixels below the take-off platform (negative = above),
+        or None if the arc can never land on it."""
+        # First falling frame where the feet are below the platform top
+        first = bisect.bisect_right(self.drops, dy)
+        # Last falling frame where the head is still above the platform bottom
+        last = bisect.bisect_left(self.drops, dy + self.player_height + target_height) - 1
+        if first >= len(self.drops) or first > last:
+            return None
+        return self.speed * self.frames[last]
+
+    def highest_landing(self, target_height):
+        """Smallest (most negative) dy that can still be landed on."""
+        return self.drops[0] - self.player_height - target_height + 1
+
+    def lowest_landing(self):
+        """Largest dy covered by the precomputed arc."""
+        return self.drops[-1] - 1
+
+    def nearest_landing(self, dy, target_height):
+        """Closest dy to `dy` that can be landed on.
+
+        Fast falls move several pixels per frame, so a thin platform placed
+        between two falling frames is passed straight through.
+        """
+        dy = max(dy, self.highest_landing(target_height))
+        dy = min(dy, self.lowest_landing())
+        if self.reach(dy, target_height) is not None:
+            return dy
+
+        # dy sits between the last frame above it and the next frame below
+        first = bisect.bisect_right(self.drops, dy)
+        above = self.drops[first - 1] - 1
+        below = self.drops[first] - self.player_height - target_height + 1
+        if dy - above <= below - dy:
+            return above
+        return below
+
+    def gap(self, source, target):
+        """Sideways distance the player has to cover to get from standing on
+        `source` to standing on `target`."""
+        sx, sy, sw, sh = source
+        tx, ty, tw, th = target
+        # The player stands on a platform while x is in (left - width, right)
+        return max(0,
+                   tx - (sx + sw) - self.player_width + 2,
+                   sx - (tx + tw) - self.player_width + 2)
+
+    def can_reach(self, source, target):
+        """Check if a single jump from `source` can land on `target`."""
+        reach = self.reach(target[1] - source[1], target[3])
+        return reach is not None and self.gap(source, target) <= reach
+
+
+class LevelGraph:
+    """Reachability graph between the platforms of a layout.
+
+    Platforms are kept in an index sorted by their left edge, so each
+    platform is only compared with the neighbours that fall inside the
+    player's maximum sideways reach.
+    """
+
+    def __init__(self, layout, envelope):
+        self.layout = list(layout)
+        self.envelope = envelope
+        self.edges = [[] for _ in self.layout]
+
+        if not self.layout:
+            return
+
+        # Platform index of (left edge, platform) sorted by left edge
+        self.index = sorted((rect[0], i) for i, rect in enumerate(self.layout))
+        self.lowest_top = max(rect[1] for rect in self.layout)
+        self.widest = max(rect[2] for rect in self.layout)
+        self.tallest = max(rect[3] for rect in self.layout)
+
+        for i in range(len(self.layout)):
+            self.edges[i] = self._edges_from(i)
+
+    def _edges_from(self, i):
+        envelope = self.envelope
+        sx, sy, sw, sh = self.layout[i]
+        # Longest possible sideways reach is the drop to the lowest platform
+        max_reach = envelope.reach(self.lowest_top - sy, self.tallest)
+        if max_reach is None:
+            max_reach = envelope.speed * envelope.frames[-1]
+
+        margin = max_reach + envelope.player_width
+        start = bisect.bisect_left(self.index, (sx - margin - self.widest, -1))
+        end = bisect.bisect_right(self.index, (sx + sw + margin, len(self.layout)))
+        return [j for left, j in self.index[start:end]
+                if j != i and envelope.can_reach(self.layout[i], self.layout[j])]
+
+    def _move(self, i, rect):
+        """Move platform `i` and recompute the edges leaving it.
+
+        Edges from other platforms into `i` are not updated, so only use
+        this on platforms none of the reachable ones lead to.
+        """
+        del self.index[bisect.bisect_left(self.index, (self.layout[i][0], i))]
+        self.layout[i] = rect
+        bisect.insort(self.index, (rect[0], i))
+        self.lowest_top = max(self.lowest_top, rect[1])
+        self.edges[i] = self._edges_from(i)
+
+    def _extend(self, seen, sources):
+        """Add everything reachable from `sources` to the set `seen` and
+        return the newly added platforms."""
+        added = []
+        queue = deque(sources)
+        while queue:
+            current = queue.popleft()
+            for neighbour in self.edges[current]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    added.append(neighbour)
+                    queue.append(neighbour)
+        return added
+
+    def reachable_from(self, start=0):
+        """Return the set of platform indices reachable from `start`."""
+        seen = {start}
+        self._extend(seen, [start])
+        return seen
+
+    def unreachable_from(self, start=0):
+        """Return the sorted indices of platforms that can never be reached."""
+        seen = self.reachable_from(start)
+        return [i for i in range(len(self.layout)) if i not in seen]
+
+
+def validate_layout(layout, envelope, start=0):
+    """Return True if every platform can be reached from `start`."""
+    if not layout:
+        return True
+    return not LevelGraph(layout, envelope).unreachable_from(start)
+
+
+def _closest_source(graph, target, reachable_index):
+    """Find the reachable platform with the smallest gap to `target`.
+
+    `reachable_index` holds (left edge, platform) for the reachable
+    platforms, sorted by left edge. The search walks outwards from the
+    target and stops once no further platform can be closer.
+    """
+    envelope = graph.envelope
+    rect = graph.layout[target]
+    tx, ty, tw, th = rect
+    best = None
+    middle = bisect.bisect_left(reachable_index, (tx, -1))
+
+    # Platforms starting right of the target
+    for position in range(middle, len(reachable_index)):
+        left, source = reachable_index[position]
+        if best is not None and left - (tx + tw) - envelope.player_width + 2 > best[0]:
+            break
+        distance = envelope.gap(graph.layout[source], rect)
+        if best is None or distance < best[0]:
+            best = (distance, source)
+
+    # Platforms starting left of the target
+    for position in range(middle - 1, -1, -1):
+        left, source = reachable_index[position]
+        if best is not None and tx - (left + graph.widest) - envelope.player_width + 2 > best[0]:
+            break
+        distance = envelope.gap(graph.layout[source], rect)
+        if best is None or distance < best[0]:
+            best = (distance, source)
+
+    return best[1]
+
+
+def repair_layout(layout, envelope, start=0):
+    """Move unreachable platforms until the whole layout can be reached.
+
+    Unreachable platforms are handled from left to right. Each one is
+    pulled towards the closest reachable platform: first vertically into
+    the jump height, then sideways into the jump distance. Returns a new
+    list of (x, y, width, height) tuples.
+    """
+    layout = [tuple(rect) for rect in layout]
+    if not layout:
+        return layout
+
+    graph = LevelGraph(layout, envelope)
+    reachable = graph.reachable_from(start)
+    reachable_index = sorted((graph.layout[i][0], i) for i in reachable)
+
+    for left, target in list(graph.index):
+        if target in reachable:
+            continue
+
+        source = _closest_source(graph, target, reachable_index)
+        sx, sy, sw, sh = graph.layout[source]
+        tx, ty, tw, th = graph.layout[target]
+
+        # Bring the platform within jumping height
+        dy = envelope.nearest_landing(ty - sy, th)
+        ty = sy + dy
+
+        # Bring the platform within jumping distance
+        reach = envelope.reach(dy, th)
+        overshoot = envelope.gap((sx, sy, sw, sh), (tx, ty, tw, th)) - reach
+        if overshoot > 0:
+            if tx > sx:
+                tx -= overshoot
+            else:
+                tx += overshoot
+
+        # Moving an unreachable platform never breaks an existing path, so
+        # only its own edges change and the search carries on from it
+        graph._move(target, (tx, ty, tw, th))
+        reachable.add(target)
+        for index in [target] + graph._extend(reachable, [target]):
+            bisect.insort(reachable_index, (graph.layout[index][0], index))
+
+    return graph.layout
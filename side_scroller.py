@@ -1,6 +1,10 @@
 import pygame
 import random
 
+from frame_capture import new_recording, wait_for_recordings
+from level_analysis import JumpEnvelope, repair_layout
+from telemetry import Telemetry
+
 # Initialize pygame
 pygame.init()
 
@@ -8,6 +12,7 @@ pygame.init()
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 GRAVITY = 1
+JUMP_VELOCITY = -15
 SCROLL_THRESHOLD = 200  # How close to the edge the player can get before the screen scrolls
 
 # Colors
@@ -31,6 +36,7 @@ class Player:
         self.speed = 5
         self.jumping = False
         self.facing_right = True
+        self.platform = None  # Platform the player is standing on
         
         # For animation/display purposes (simple rectangle for now)
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
@@ -48,7 +54,7 @@ class Player:
     def jump(self):
         # Player can only jump if not already jumping
         if not self.jumping:
-            self.velocity_y = -15
+            self.velocity_y = JUMP_VELOCITY
             self.jumping = True
             
     def update(self, platforms):
@@ -60,6 +66,7 @@ class Player:
         
         # Check for collision with platforms
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.platform = None
         for platform in platforms:
             if self.rect.colliderect(platform.rect):
                 # If falling down or standing
@@ -67,6 +74,7 @@ class Player:
                     self.y = platform.rect.top - self.height
                     self.velocity_y = 0
                     self.jumping = False
+                    self.platform = platform
         
         # Prevent player from going off the left edge of the screen
         if self.x < 0:
@@ -90,17 +98,31 @@ def main():
     # Initialize game variables
     player = Player()
     scroll = 0
+    recorder = None
+    
+    # Record the session in the background
+    telemetry = Telemetry()
+    telemetry.start()
+    session = telemetry.start_session("side_scroller")
+    furthest_x = player.x
+    furthest_platform_x = None
     
-    # Create platforms
-    platforms = []
+    # Create platform layout as (x, y, width, height)
+    layout = []
     # Ground platform
-    platforms.append(Platform(0, SCREEN_HEIGHT - 50, 1000, 50))
+    layout.append((0, SCREEN_HEIGHT - 50, 1000, 50))
     
     # Add some random platforms
     for i in range(10):
-        platforms.append(Platform(random.randint(400, 3000), 
-                                random.randint(SCREEN_HEIGHT - 300, SCREEN_HEIGHT - 100), 
-                                random.randint(100, 300), 30))
+        layout.append((random.randint(400, 3000), 
+                       random.randint(SCREEN_HEIGHT - 300, SCREEN_HEIGHT - 100), 
+                       random.randint(100, 300), 30))
+    
+    # Move any platform the player could never jump to
+    envelope = JumpEnvelope(GRAVITY, JUMP_VELOCITY, player.speed, player.width, player.height)
+    layout = repair_layout(layout, envelope)
+    
+    platforms = [Platform(*rect) for rect in layout]
     
     # Main game loop
     running = True
@@ -112,6 +134,13 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     player.jump()
+                if event.key == pygame.K_F12:
+                    # Start or stop recording
+                    if recorder:
+                        recorder.stop()
+                        recorder = None
+                    else:
+                        recorder = new_recording("side_scroller")
         
         # Get key states for continuous movement
         keys = pygame.key.get_pressed()
@@ -126,7 +155,18 @@ def main():
         player.move(dx)
         
         # Update player
+        was_standing = player.platform is not None
         player.update(platforms)
+        furthest_x = max(furthest_x, player.x)
+        
+        # Log landings and every new furthest platform reached
+        if player.platform is not None and not was_standing:
+            platform_x = player.platform.rect.x
+            telemetry.event(session, "landing", platform=platforms.index(player.platform),
+                            x=platform_x, y=player.platform.rect.y)
+            if furthest_platform_x is None or platform_x > furthest_platform_x:
+                furthest_platform_x = platform_x
+                telemetry.event(session, "furthest_platform", x=platform_x)
         
         # Handle scrolling
         if player.x > SCREEN_WIDTH - SCROLL_THRESHOLD:
@@ -142,11 +182,22 @@ def main():
         # Draw player
         player.draw(scroll)
         
+        # Hand the finished frame to the recorder (copied, not saved here)
+        if recorder:
+            recorder.capture(screen)
+        
         # Update display
         pygame.display.flip()
         
         # Control game speed
         clock.tick(60)
+    
+    if recorder:
+        recorder.stop()
+    wait_for_recordings()
+    
+    telemetry.end_session(session, distance=furthest_x)
+    telemetry.stop()
 
 # Run the game
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+import random
+import time
+from collections import deque
+
+# Shared-arena mode for many snakes on one large board.
+# Kept separate from snake_game so it runs without the Windows console.
+# Cells are stored as y * width + x in one bytearray occupancy grid, so a
+# tick only touches the cells around each snake's head and tail.
+
+# Arena settings
+ARENA_WIDTH = 2000
+ARENA_HEIGHT = 2000
+
+# Cell values in the occupancy grid
+EMPTY = 0
+BODY = 1
+FOOD = 2
+WALL = 3
+
+# Directions (same key codes as snake_game)
+UP = 72
+DOWN = 80
+LEFT = 75
+RIGHT = 77
+
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+
+class ArenaSnake:
+    def __init__(self, head, direction, controller=None):
+        self.body = deque([head])  # Cell indices, head first
+        self.direction = direction
+        self.grow = False
+        self.score = 0
+        self.alive = True
+        self.controller = controller  # Called as controller(snake, arena) -> direction or None
+
+    def change_direction(self, new_direction):
+        # Prevent 180-degree turns
+        if new_direction is None or new_direction == OPPOSITE[self.direction]:
+            return
+        self.direction = new_direction
+
+    def get_head(self):
+        return self.body[0]
+
+
+class Arena:
+    def __init__(self, width=ARENA_WIDTH, height=ARENA_HEIGHT, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+        self.grid = bytearray(width * height)
+        self.snakes = []
+        self.food_count = 0
+        self.ticks = 0
+
+        # Cell offset for every direction
+        self.offsets = {UP: -width, DOWN: width, LEFT: -1, RIGHT: 1}
+
+        # Border cells are walls, so a head never has to check its x and y
+        for x in range(width):
+            self.grid[x] = WALL
+            self.grid[(height - 1) * width + x] = WALL
+        for y in range(height):
+            self.grid[y * width] = WALL
+            self.grid[y * width + width - 1] = WALL
+
+    def cell(self, x, y):
+        return y * self.width + x
+
+    def position(self, cell):
+        return cell % self.width, cell // self.width
+
+    def random_empty_cell(self):
+        while True:
+            cell = self.cell(self.rng.randint(1, self.width - 2), self.rng.randint(1, self.height - 2))
+            if self.grid[cell] == EMPTY:
+                return cell
+
+    def add_snake(self, x, y, direction=RIGHT, controller=None):
+        """Place a new one-cell snake. Returns None if the cell is taken."""
+        cell = self.cell(x, y)
+        if self.grid[cell] != EMPTY:
+            return None
+        snake = ArenaSnake(cell, direction, controller)
+        self.grid[cell] = BODY
+        self.snakes.append(snake)
+        return snake
+
+    def spawn_snakes(self, count, controller=None):
+        for _ in range(count):
+            x, y = self.position(self.random_empty_cell())
+            self.add_snake(x, y, self.rng.choice((UP, DOWN, LEFT, RIGHT)), controller)
+
+    def place_food(self, count=1):
+        for _ in range(count):
+            self.grid[self.random_empty_cell()] = FOOD
+            self.food_count += 1
+
+    def _resolve_moves(self, moves, moving_from):
+        """Sort all moves of a tick into survivors and crashed snakes.
+
+        `moves` holds (snake, new head) for every snake and `moving_from`
+        maps the cells left empty this tick to where their snake went.
+        The grid is only read here.
+        """
+        heads = {}
+        for snake, cell in moves:
+            heads.setdefault(cell, []).append(snake)
+
+        moved = []
+        crashed = []
+        grid = self.grid
+        for cell, snakes in heads.items():
+            # Head-to-head, head-to-body and wall collisions
+            if len(snakes) > 1 or grid[cell] == BODY or grid[cell] == WALL:
+                crashed.extend(snakes)
+                continue
+            snake = snakes[0]
+            # Two heads swapping cells would pass through each other
+            if cell in moving_from and moving_from[cell] == cell - self.offsets[snake.direction]:
+                crashed.append(snake)
+            else:
+                moved.append((snake, cell))
+        return moved, crashed
+
+    def tick(self):
+        """Advance every snake by one cell and resolve all collisions.
+
+        Returns the list of snakes that died this tick.
+        """
+        grid = self.grid
+        offsets = self.offsets
+
+        # Let players and AI steer
+        for snake in self.snakes:
+            if snake.controller:
+                snake.change_direction(snake.controller(snake, self))
+
+        # Work out every new head, then free the tails that move away
+        moves = []
+        moving_from = {}
+        for snake in self.snakes:
+            new_head = snake.body[0] + offsets[snake.direction]
+            moves.append((snake, new_head))
+            if snake.grow:
+                snake.grow = False
+                snake.score += 1
+            else:
+                grid[snake.body.pop()] = EMPTY
+                # Longer snakes keep their old head as body, so only a
+                # one-cell snake can swap places with another head
+                if not snake.body:
+                    moving_from[new_head - offsets[snake.direction]] = new_head
+
+        moved, dead = self._resolve_moves(moves, moving_from)
+
+        eaten = 0
+        for snake, cell in moved:
+            if grid[cell] == FOOD:
+                snake.grow = True
+                eaten += 1
+            grid[cell] = BODY
+            snake.body.appendleft(cell)
+
+        # Remove crashed snakes from the board
+        for snake in dead:
+            snake.alive = False
+            for cell in snake.body:
+                grid[cell] = EMPTY
+        if dead:
+            self.snakes = [snake for snake in self.snakes if snake.alive]
+
+        # Keep the amount of food on the board constant
+        self.food_count -= eaten
+        self.place_food(eaten)
+
+        self.ticks += 1
+        return dead
+
+
+def wander_controller(snake, arena):
+    """Simple AI: keep going, turn now and then, and avoid blocked cells."""
+    head = snake.body[0]
+    grid = arena.grid
+    direction = snake.direction
+    if arena.rng.random() < 0.05:
+        direction = arena.rng.choice((UP, DOWN, LEFT, RIGHT))
+        if direction == OPPOSITE[snake.direction]:
+            direction = snake.direction
+
+    if grid[head + arena.offsets[direction]] in (EMPTY, FOOD):
+        return direction
+    for turn in (UP, DOWN, LEFT, RIGHT):
+        if turn != OPPOSITE[snake.direction] and grid[head + arena.offsets[turn]] in (EMPTY, FOOD):
+            return turn
+    return direction
+
+
+def main():
+    arena = Arena(seed=1)
+    arena.spawn_snakes(5000, wander_controller)
+    arena.place_food(20000)
+
+    start_time = time.time()
+    ticks = 200
+    for _ in range(ticks):
+        arena.tick()
+    elapsed = time.time() - start_time
+
+    print(f"Board: {arena.width}x{arena.height}, snakes alive: {len(arena.snakes)}")
+    print(f"Average tick: {elapsed / ticks * 1000:.2f} ms")
+    if arena.snakes:
+        best = max(arena.snakes, key=lambda snake: snake.score)
+        print(f"Best score: {best.score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import time
 import ctypes
 import ctypes.wintypes
 
+from telemetry import Telemetry
+
 # Windows console functions
 STD_OUTPUT_HANDLE = -11
 stdout_handle = ctypes.windll.kernel32.GetStdHandle(STD_OUTPUT_HANDLE)
@@ -215,6 +217,11 @@ def main():
     food_pos = generate_food(snake)
     running = True
     
+    # Record the session in the background
+    telemetry = Telemetry()
+    telemetry.start()
+    session = telemetry.start_session("snake")
+    
     # Initialize board state trackers
     prev_board = None
     current_board = None
@@ -243,16 +250,23 @@ def main():
         
         # Check for collisions
         if snake.check_collision():
+            telemetry.event(session, "death", score=snake.score, length=len(snake.body))
             running = False
         
         # Check for food
         if snake.check_food(food_pos):
             snake.grow = True
+            # The score only goes up on the next move, so it is not logged here
+            telemetry.event(session, "food", x=food_pos[0], y=food_pos[1])
             food_pos = generate_food(snake)
     
+    telemetry.end_session(session, score=snake.score)
+    telemetry.stop()
+    
     os.system('cls')
     print("Game Over!")
     print(f"Final Score: {snake.score}")
+    print(f"High Score: {telemetry.high_score('snake')}")
     print("Press any key to exit...")
     msvcrt.getch()
 
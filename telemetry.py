@@ -0,0 +1,246 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# Telemetry and high scores for the games.
+# The game loop only puts records on an in-memory queue; a background
+# thread writes them to SQLite in batches, so a slow disk never stalls a
+# frame.
+
+TELEMETRY_FILE = "telemetry.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    game TEXT NOT NULL,
+    started REAL NOT NULL,
+    ended REAL NOT NULL,
+    duration REAL NOT NULL,
+    score INTEGER,
+    level INTEGER,
+    deaths INTEGER NOT NULL,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    game TEXT NOT NULL,
+    time REAL NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS high_scores (
+    session_id TEXT PRIMARY KEY,
+    game TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS high_scores_top ON high_scores (game, score DESC);
+"""
+
+
+class Session:
+    def __init__(self, game):
+        self.id = uuid.uuid4().hex
+        self.game = game
+        self.started = time.time()
+        self.deaths = 0
+        self.ended = False
+
+
+class Telemetry:
+    """Queue telemetry records and write them on a background thread.
+
+    Records are never waited on: if the queue is full the record is
+    dropped and counted. Old events and sessions are rotated out once
+    there are more than `max_events` / `max_sessions`; high scores are
+    kept. The best score of every game is also kept in memory, so the
+    game loop can show it without touching the database.
+    """
+
+    def __init__(self, filename=TELEMETRY_FILE, max_queue=10000, batch_size=256,
+                 flush_interval=1.0, max_events=100000, max_sessions=10000):
+        self.filename = filename
+        self.records = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.max_sessions = max_sessions
+        self.thread = None
+
+        # Best score per game, loaded by the writer and updated on every session
+        self.best_scores = {}
+        self.best_scores_lock = threading.Lock()
+
+        # Counters for watching the writer
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.error = None  # Why the writer stopped, if it failed
+
+    def start(self):
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """Write out everything still queued and stop the writer thread.
+
+        Only call this on exit; it waits at most `timeout` seconds in total.
+        """
+        if self.thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        # A writer that failed never empties the queue, so keep checking it
+        while self.thread.is_alive() and time.monotonic() < deadline:
+            try:
+                self.records.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self.thread.join(max(0.0, deadline - time.monotonic()))
+        self.thread = None
+
+    def _put(self, record):
+        try:
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start_session(self, game):
+        return Session(game)
+
+    def event(self, session, kind, **data):
+        """Record a single game event, e.g. a death or a new level."""
+        if kind == "death":
+            session.deaths += 1
+        self._put(("event", (session.id, session.game, time.time(), kind, json.dumps(data))))
+
+    def end_session(self, session, score=None, level=None, **data):
+        """Record the whole session and add its score to the high scores."""
+        if session.ended:
+            return
+        session.ended = True
+        ended = time.time()
+        self._put(("session", (session.id, session.game, session.started, ended,
+                               ended - session.started, score, level, session.deaths,
+                               json.dumps(data))))
+        if score is not None:
+            self._put(("high_score", (session.id, session.game, score, level, ended)))
+            self._update_best_score(session.game, score)
+
+    def _update_best_score(self, game, score):
+        # Called from both the game loop and the writer thread
+        with self.best_scores_lock:
+            self.best_scores[game] = max(score, self.best_scores.get(game, score))
+
+    def high_score(self, game):
+        """Best score recorded for `game` so far, or 0 if there is none."""
+        return self.best_scores.get(game, 0)
+
+    def queue_depth(self):
+        return self.records.qsize()
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+            "error": self.error,
+        }
+
+    def top_scores(self, game, count=10):
+        """Return the best (score, level, time) rows for `game`.
+
+        Uses its own connection; with WAL this does not wait for the writer.
+        This reads the database, so use high_score() from the game loop.
+        """
+        connection = sqlite3.connect(self.filename)
+        try:
+            connection.executescript(SCHEMA)
+            return connection.execute(
+                "SELECT score, level, time FROM high_scores WHERE game = ? "
+                "ORDER BY score DESC LIMIT ?", (game, count)).fetchall()
+        finally:
+            connection.close()
+
+    def _writer(self):
+        try:
+            self._write_records()
+        except (sqlite3.Error, OSError) as exc:
+            # Keep the game running; records are dropped once the queue fills
+            self.error = f"{type(exc).__name__}: {exc}"
+
+    def _write_records(self):
+        connection = sqlite3.connect(self.filename)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            for game, score in connection.execute(
+                    "SELECT game, MAX(score) FROM high_scores GROUP BY game"):
+                self._update_best_score(game, score)
+            self._write_batches(connection)
+        finally:
+            connection.close()
+
+    def _write_batches(self, connection):
+        running = True
+        while running:
+            # Wait for the first record, then take whatever else is queued
+            batch = []
+            try:
+                record = self.records.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            while record is not None:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.records.get_nowait()
+                except queue.Empty:
+                    break
+            if record is None:
+                running = False
+
+            if batch:
+                self._flush(connection, batch)
+
+    def _flush(self, connection, batch):
+        start_time = time.perf_counter()
+        events = [values for kind, values in batch if kind == "event"]
+        sessions = [values for kind, values in batch if kind == "session"]
+        high_scores = [values for kind, values in batch if kind == "high_score"]
+
+        with connection:
+            connection.executemany(
+                "INSERT INTO events (session_id, game, time, kind, data) VALUES (?, ?, ?, ?, ?)",
+                events)
+            connection.executemany(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", sessions)
+            connection.executemany(
+                "INSERT OR REPLACE INTO high_scores VALUES (?, ?, ?, ?, ?)", high_scores)
+
+            # Rotate out the oldest events and sessions
+            connection.execute(
+                "DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?",
+                (self.max_events,))
+            if sessions:
+                connection.execute(
+                    "DELETE FROM sessions WHERE id NOT IN "
+                    "(SELECT id FROM sessions ORDER BY ended DESC LIMIT ?)",
+                    (self.max_sessions,))
+
+        self.last_flush_latency = time.perf_counter() - start_time
+        self.max_flush_latency = max(self.max_flush_latency, self.last_flush_latency)
+        self.written += len(batch)
+        self.flushes += 1